@@ -4,7 +4,6 @@ Configuration constants for Water Bill PDF Processor - Network Drive Version wit
 import os
 import sys
 from pathlib import Path
-from calendar import month_name
 from datetime import datetime
 
 # Helper function to get the correct base path for bundled files
@@ -102,17 +101,25 @@ EXCEL_LAYOUT = {
     "account_col": 8,  # H
 }
 
-def month_year_folder(bill_date_str: str) -> str:
+# Folder names must stay English regardless of the PC's locale, which
+# calendar.month_name follows (and looks up on every index)
+_MONTHS = ('', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
+def month_year_folder(bill_date) -> str:
     """
-    Convert bill date string to month/year folder format.
-    bill_date_str is expected as %m/%d/%Y (e.g., 09/15/2025).
+    Convert bill date to month/year folder format.
+    bill_date is a datetime (BillData.bill_date_dt) or a %m/%d/%Y string (e.g., 09/15/2025).
     Falls back to current month/year if parsing fails.
     """
-    try:
-        dt = datetime.strptime(bill_date_str, "%m/%d/%Y")
-    except Exception:
-        dt = datetime.now()
-    return f"{month_name[dt.month]} {dt.year}"
+    if isinstance(bill_date, datetime):
+        dt = bill_date
+    else:
+        try:
+            dt = datetime.strptime(bill_date, "%m/%d/%Y")
+        except Exception:
+            dt = datetime.now()
+    return f"{_MONTHS[dt.month]} {dt.year}"
 
 def ensure_directories():
     """Create directories if they don't exist - call this when needed, not on import"""
@@ -3,5 +3,6 @@
 from .base import BaseExtractor
 from .nmwd import NMWDExtractor
 from .mmwd import MMWDExtractor
+from .pool import create_pool, extract_one
 
-__all__ = ['BaseExtractor', 'NMWDExtractor', 'MMWDExtractor']
\ No newline at end of file
+__all__ = ['BaseExtractor', 'NMWDExtractor', 'MMWDExtractor', 'create_pool', 'extract_one']
\ No newline at end of file
@@ -6,13 +6,49 @@ import os
 import re
 from typing import Optional
 
-try:
-    import pdfplumber
-except ImportError as e:
-    raise SystemExit(f"Missing PDF dependency: {e}")
-
 from extractors.base import BaseExtractor
-from models.bill_data import BillData
+from models.bill_data import BillData, parse_mmddyyyy
+
+# Patterns are compiled once at import and shared by every extraction
+
+# District check - searched case-insensitively so the page is never upper-cased
+_NMWD_NAME_RE = re.compile(r'NORTH MARIN', re.IGNORECASE)
+_ACCOUNT_RE = re.compile(r'ACCOUNT(?:/CUSTOMER)? NUMBER[:\s]*([A-Z0-9\-]{6,})', re.IGNORECASE)
+_CUSTOMER_RE = re.compile(r'Customer Number[:\s]*([A-Z0-9\-]{6,})', re.IGNORECASE)
+_BILL_DATE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})')
+_DUE_DATE_RE = re.compile(r'DUE DATE[^$]*(\d{2}/\d{2}/\d{4})', re.IGNORECASE)
+_SERVICE_ADDRESS_RE = re.compile(r'SERVICE ADDRESS.*?(\d+[^,\n]*)', re.IGNORECASE)
+# FIXED: Allow multiple comma groups for large numbers like 3,864,065
+_CURRENT_PERIOD_RE = re.compile(r'CURRENT PERIOD:?\s*(\d{1,3}(?:,\d{3})*)', re.IGNORECASE)
+_GALLONS_RE = re.compile(r'(\d{1,3}(?:,\d{3})*)\s+GAL', re.IGNORECASE)
+
+# NMWD-specific patterns - look for service period or billing period
+_PERIOD_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+        # Pattern 1: "SERVICE PERIOD: MM/DD/YYYY - MM/DD/YYYY"
+        r'SERVICE\s+PERIOD[:\s]*(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+
+        # Pattern 2: "BILLING PERIOD: MM/DD/YYYY - MM/DD/YYYY"
+        r'BILLING\s+PERIOD[:\s]*(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+
+        # Pattern 3: "FROM MM/DD/YYYY TO MM/DD/YYYY" (but only in service context)
+        r'(?:SERVICE|BILLING|PERIOD).*?FROM\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+TO\s+(\d{1,2}/\d{1,2}/\d{2,4})',
+
+        # Pattern 4: Look for dates near "CURRENT PERIOD" text
+        r'CURRENT\s+PERIOD.*?(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+
+        # Pattern 5: Look in a table structure for service dates
+        r'(?:Service|Billing).*?(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+    )
+]
+_ANY_DATE_RE = re.compile(r'(\d{1,2}/\d{1,2}/\d{2,4})')
+
+_MONEY_RE = re.compile(r'\$?\s*\(?(?:\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{2})?\)?')
+_STRICT_TOTAL_DUE_RE = re.compile(
+    r'(?:^|\n)\s*(?:TOTAL\s+(?:AMOUNT\s+)?DUE(?:\s+NOW)?)\s*[:\-]?\s*\$?\s*'
+    r'(\(?(?:\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{2})?\)?)',
+    re.IGNORECASE | re.MULTILINE
+)
 
 class NMWDExtractor(BaseExtractor):
     """Extract data from North Marin Water District bills"""
@@ -20,66 +56,62 @@ class NMWDExtractor(BaseExtractor):
     def extract_data(self, pdf_path: str) -> Optional[BillData]:
         """Extract data from North Marin Water District bill"""
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                text = pdf.pages[0].extract_text()
-
-                if not self._is_nmwd_bill(text):
-                    # Only try OCR if text extraction failed AND OCR is available
-                    if not text and hasattr(self, '_ocr_extract'):
-                        text = self._ocr_extract(pdf_path)
-                        if not self._is_nmwd_bill(text):
-                            return None
-                    else:
-                        return None
-
-                if not text:
-                    return None
-
-                print(f"DEBUG NMWD: Extracting from text length {len(text)}")
-
-                account_number = (
-                    self._extract_pattern(text, r'ACCOUNT(?:/CUSTOMER)? NUMBER[:\s]*([A-Z0-9\-]{6,})') or
-                    self._extract_pattern(text, r'Customer Number[:\s]*([A-Z0-9\-]{6,})')
-                )
-
-                bill_date = self._extract_pattern(text, r'(\d{2}/\d{2}/\d{4})')
-
-                due_date = "Upon Receipt" if "Upon Receipt" in text else \
-                          self._extract_pattern(text, r'DUE DATE[^$]*(\d{2}/\d{2}/\d{4})')
-
-                total_due = self._extract_nmwd_total_due(text)
-
-                service_address = self._extract_pattern(text, r'SERVICE ADDRESS.*?(\d+[^,\n]*)')
-
-                # FIXED: Allow multiple comma groups for large numbers like 3,864,065
-                current_usage = (
-                    self._extract_number(text, r'CURRENT PERIOD:?\s*(\d{1,3}(?:,\d{3})*)') or
-                    self._extract_number(text, r'(\d{1,3}(?:,\d{3})*)\s+GAL') or 0
-                )
-
-                # Updated date extraction for NMWD
-                start_date, end_date = self._extract_nmwd_period_dates(text)
-                service_period = f"{start_date} - {end_date}" if start_date and end_date else ""
-
-                print(f"DEBUG NMWD: Extracted dates - start: {start_date}, end: {end_date}")
-                print(f"DEBUG NMWD: Extracted usage: {current_usage:,} gallons")
-
-                if not account_number or total_due is None:
-                    return None
-
-                return BillData(
-                    account_number=account_number,
-                    bill_date=bill_date or '',
-                    due_date=due_date or "Upon Receipt",
-                    total_due=total_due,
-                    service_address=service_address or '',
-                    bill_start_date=start_date,
-                    bill_end_date=end_date,
-                    current_usage_gallons=current_usage,
-                    service_period=service_period,
-                    district="North Marin",
-                    original_filename=os.path.basename(pdf_path)
-                )
+            text = self._page_text(pdf_path)
+
+            # Only try OCR if there is no usable text layer
+            if self._needs_ocr(text):
+                text = self._ocr_extract(pdf_path)
+
+            if not self._is_nmwd_bill(text):
+                return None
+
+            if not text:
+                return None
+
+            print(f"DEBUG NMWD: Extracting from text length {len(text)}")
+
+            account_number = (
+                self._extract_pattern(text, _ACCOUNT_RE) or
+                self._extract_pattern(text, _CUSTOMER_RE)
+            )
+
+            bill_date = self._extract_pattern(text, _BILL_DATE_RE)
+
+            due_date = "Upon Receipt" if "Upon Receipt" in text else \
+                      self._extract_pattern(text, _DUE_DATE_RE)
+
+            total_due = self._extract_nmwd_total_due(text)
+
+            service_address = self._extract_pattern(text, _SERVICE_ADDRESS_RE)
+
+            current_usage = (
+                self._extract_number(text, _CURRENT_PERIOD_RE) or
+                self._extract_number(text, _GALLONS_RE) or 0
+            )
+
+            # Updated date extraction for NMWD
+            start_date, end_date = self._extract_nmwd_period_dates(text)
+            service_period = f"{start_date} - {end_date}" if start_date and end_date else ""
+
+            print(f"DEBUG NMWD: Extracted dates - start: {start_date}, end: {end_date}")
+            print(f"DEBUG NMWD: Extracted usage: {current_usage:,} gallons")
+
+            if not account_number or total_due is None:
+                return None
+
+            return BillData(
+                account_number=account_number,
+                bill_date=bill_date or '',
+                due_date=due_date or "Upon Receipt",
+                total_due=total_due,
+                service_address=service_address or '',
+                bill_start_date=start_date,
+                bill_end_date=end_date,
+                current_usage_gallons=current_usage,
+                service_period=service_period,
+                district="North Marin",
+                original_filename=os.path.basename(pdf_path)
+            )
 
         except Exception as e:
             self.logger.error(f"Failed to extract NMWD data from {pdf_path}: {e}")
@@ -95,26 +127,8 @@ class NMWDExtractor(BaseExtractor):
         # Normalize different dash types
         normalized_text = text.replace("\u2012", "-").replace("\u2013", "-").replace("\u2014", "-").replace("\u2212", "-")
 
-        # NMWD-specific patterns - look for service period or billing period
-        patterns = [
-            # Pattern 1: "SERVICE PERIOD: MM/DD/YYYY - MM/DD/YYYY"
-            r'SERVICE\s+PERIOD[:\s]*(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-
-            # Pattern 2: "BILLING PERIOD: MM/DD/YYYY - MM/DD/YYYY"
-            r'BILLING\s+PERIOD[:\s]*(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-
-            # Pattern 3: "FROM MM/DD/YYYY TO MM/DD/YYYY" (but only in service context)
-            r'(?:SERVICE|BILLING|PERIOD).*?FROM\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+TO\s+(\d{1,2}/\d{1,2}/\d{2,4})',
-
-            # Pattern 4: Look for dates near "CURRENT PERIOD" text
-            r'CURRENT\s+PERIOD.*?(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-
-            # Pattern 5: Look in a table structure for service dates
-            r'(?:Service|Billing).*?(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-        ]
-
-        for i, pattern in enumerate(patterns):
-            match = re.search(pattern, normalized_text, re.IGNORECASE | re.DOTALL)
+        for i, pattern in enumerate(_PERIOD_PATTERNS):
+            match = pattern.search(normalized_text)
             if match:
                 start_date = self._normalize_date(match.group(1))
                 end_date = self._normalize_date(match.group(2))
@@ -131,7 +145,7 @@ class NMWDExtractor(BaseExtractor):
 
             # Look for two dates in lines that might contain service period info
             if any(keyword in line.upper() for keyword in ['PERIOD', 'SERVICE', 'USAGE', 'CURRENT']):
-                date_matches = re.findall(r'(\d{1,2}/\d{1,2}/\d{2,4})', line)
+                date_matches = _ANY_DATE_RE.findall(line)
                 if len(date_matches) >= 2:
                     start_date = self._normalize_date(date_matches[0])
                     end_date = self._normalize_date(date_matches[1])
@@ -144,7 +158,6 @@ class NMWDExtractor(BaseExtractor):
     def _normalize_date(self, date_str: str) -> str:
         """Normalize date to MM/DD/YYYY format"""
         try:
-            from datetime import datetime
             # Handle 2-digit years
             if date_str.count('/') == 2:
                 parts = date_str.split('/')
@@ -153,8 +166,8 @@ class NMWDExtractor(BaseExtractor):
                     date_str = "/".join(parts)
 
             # Parse and reformat
-            dt = datetime.strptime(date_str, "%m/%d/%Y")
-            return dt.strftime("%m/%d/%Y")
+            dt = parse_mmddyyyy(date_str)
+            return f"{dt.month:02d}/{dt.day:02d}/{dt.year}" if dt else date_str
         except:
             return date_str
 
@@ -163,27 +176,8 @@ class NMWDExtractor(BaseExtractor):
         if not text:
             return False
 
-        text_upper = text.upper()
-
-        strong_nmwd_indicators = [
-            "NORTH MARIN WATER DISTRICT",
-            "NORTH MARIN",
-        ]
-
-        strong_mmwd_indicators = [
-            "MARIN MUNICIPAL",
-            "220 NELLEN AVENUE",
-            "CORTE MADERA",
-            "MARINWATER.ORG"
-        ]
-
-        has_strong_nmwd = any(indicator in text_upper for indicator in strong_nmwd_indicators)
-        has_strong_mmwd = any(indicator in text_upper for indicator in strong_mmwd_indicators)
-
-        if has_strong_nmwd and has_strong_mmwd:
-            return "NORTH MARIN" in text_upper
-
-        return has_strong_nmwd and not has_strong_mmwd
+        # "NORTH MARIN" wins even when Marin Municipal indicators also appear
+        return _NMWD_NAME_RE.search(text) is not None
 
     def _extract_nmwd_total_due(self, text: str) -> Optional[float]:
         """
@@ -193,14 +187,13 @@ class NMWDExtractor(BaseExtractor):
           - On that line, take the LAST currency-looking value (right-aligned on bills)
           - Fall back to a strict label→amount pattern if needed
         """
-        money_pat = re.compile(r'\$?\s*\(?(?:\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{2})?\)?')
         best: Optional[float] = None
 
         for raw_line in text.splitlines():
             line = raw_line.strip()
             upper_line = line.upper()
             if "TOTAL" in upper_line and "DUE" in upper_line:
-                amounts = list(money_pat.finditer(line))
+                amounts = list(_MONEY_RE.finditer(line))
                 if amounts:
                     amount_str = amounts[-1].group(0)
                     amount_str = amount_str.replace('$', '').replace(',', '').strip()
@@ -217,11 +210,7 @@ class NMWDExtractor(BaseExtractor):
         if best is not None:
             return best
 
-        strict_pattern = (
-            r'(?:^|\n)\s*(?:TOTAL\s+(?:AMOUNT\s+)?DUE(?:\s+NOW)?)\s*[:\-]?\s*\$?\s*'
-            r'(\(?(?:\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{2})?\)?)'
-        )
-        strict_match = re.search(strict_pattern, text, flags=re.IGNORECASE | re.MULTILINE)
+        strict_match = _STRICT_TOTAL_DUE_RE.search(text)
         if strict_match:
             amount_str = strict_match.group(1).replace(',', '').replace('$', '').strip()
             is_negative = amount_str.startswith('(') and amount_str.endswith(')')
@@ -0,0 +1,89 @@
+"""
+Process-pool helpers for extracting many bills in parallel
+"""
+
+import os
+import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from extractors.base import BaseExtractor, TEXT_BACKEND, pytesseract, extract_first_page_text
+from extractors.nmwd import NMWDExtractor
+from extractors.mmwd import MMWDExtractor
+from models.bill_data import BillData
+
+logger = logging.getLogger(__name__)
+
+# ProcessPoolExecutor rejects more than 61 workers on Windows
+MAX_WORKERS = 61
+
+# Extractors are created once per worker process and reused for every bill
+_nmwd_extractor = None
+_mmwd_extractor = None
+
+def _init_worker(tesseract_cmd: Optional[str], log_queue=None):
+    """Pool initializer - keep Tesseract single threaded, use the parent's binary and log file"""
+    # Several Tesseract processes in parallel beat one multi-threaded one
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if tesseract_cmd and pytesseract is not None:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    # Spawned workers start with no logging setup - send every record to the
+    # parent's listener, which writes it to the debug log
+    if log_queue is not None:
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(queue_handler)
+        root_logger.setLevel(logging.DEBUG)
+
+def create_pool(max_workers: int, log_queue=None) -> ProcessPoolExecutor:
+    """Create a process pool whose workers run extract_one() and log to log_queue"""
+    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd if pytesseract is not None else None
+    # With spawn (the Windows default) workers are started one per submitted
+    # job until max_workers is reached, so a small batch only starts a few
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(max_workers, MAX_WORKERS)),
+        initializer=_init_worker,
+        initargs=(tesseract_cmd, log_queue)
+    )
+
+def extract_one(pdf_path: str) -> Optional[BillData]:
+    """Extract a bill from either district - runs inside a worker process"""
+    global _nmwd_extractor, _mmwd_extractor
+
+    text = None
+    try:
+        text = extract_first_page_text(pdf_path)
+        logger.debug(f"Raw text length ({TEXT_BACKEND}): {len(text) if text else 0}")
+        if text:
+            logger.debug(f"First 200 chars: {repr(text[:200])}")
+    except Exception as e:
+        logger.error(f"Debug extraction failed: {e}")
+
+    if _nmwd_extractor is None:
+        _nmwd_extractor = NMWDExtractor()
+    if _mmwd_extractor is None:
+        _mmwd_extractor = MMWDExtractor()
+
+    # Cheap prefilter: a usable text layer that neither district check
+    # recognizes can't be a water bill. Scanned PDFs (no or too little text)
+    # still go through the extractors for OCR.
+    if (not BaseExtractor._needs_ocr(text)
+            and not _nmwd_extractor._is_nmwd_bill(text)
+            and not _mmwd_extractor._is_mmwd_bill(text)):
+        logger.info(f"Skipping {os.path.basename(pdf_path)}: no water district keyword in text")
+        return None
+
+    bill_data = _nmwd_extractor.extract_data(pdf_path)
+    if bill_data and bill_data.district == "North Marin":
+        return bill_data
+
+    bill_data = _mmwd_extractor.extract_data(pdf_path)
+    if bill_data and bill_data.district == "Marin Municipal":
+        return bill_data
+
+    return None
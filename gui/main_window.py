@@ -3,11 +3,17 @@ Main GUI window for Water Bill PDF Processor - Windows Optimized
 """
 
 import os
+import mmap
+import hashlib
 import logging
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
+import queue
+import threading
 from urllib.parse import urlparse, unquote
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +24,35 @@ except Exception:
     DND_OK = False
     DND_FILES = None
 
-from extractors.nmwd import NMWDExtractor
-from extractors.mmwd import MMWDExtractor
-from processors.file_renamer import FileRenamer
-from processors.excel_processor import ExcelProcessor
 from config import BILLS_DIRS, REPORTS_ROOT, TEMPLATES, month_year_folder, ensure_directories
 
+# Results table columns: (heading, width, minwidth)
+RESULT_COLUMNS = (
+    ("Original File", 180, 120),
+    ("Renamed File", 180, 120),
+    ("Account", 100, 80),
+    ("Statement Date", 110, 90),
+    ("Bill Start", 90, 70),
+    ("Bill End", 90, 70),
+    ("Usage (gal)", 100, 80),
+    ("Amount", 90, 70),
+    ("Status", 80, 60),
+)
+
+def _file_digest(path) -> str:
+    """Content hash of a file, used to spot the same PDF selected twice"""
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.blake2b(mm, digest_size=16).hexdigest()
+        except ValueError:
+            # Empty files can't be mapped
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
 class WaterBillProcessorGUI:
     """Main GUI application for water bill processing"""
 
-    def __init__(self, root):
+    def __init__(self, root, log_queue=None, log_dir=None):
         self.root = root
         self.root.title("Commercial Energy Water Bill PDF Processor")
 
@@ -41,15 +66,28 @@ class WaterBillProcessorGUI:
         # Set window colors for better Windows appearance
         self.root.configure(bg="#f0f0f0")
 
-        # Initialize processors
-        self.nmwd_extractor = NMWDExtractor()
-        self.mmwd_extractor = MMWDExtractor()
-        self.renamer = FileRenamer()
-        self.excel_processor = ExcelProcessor()
+        # Processors are created on first use (see properties below) so the
+        # window appears before pdfplumber/openpyxl are imported. Extraction
+        # runs in worker processes (extractors.pool).
+        self._renamer = None
+        self._excel_processor = None
+
+        # Multiprocessing queue read by the log listener in main.py - handed
+        # to the pool so worker log records reach the debug log
+        self._log_queue = log_queue
+
+        # Folder setup_logging() chose for the debug logs, shown when a run fails
+        self._log_dir = log_dir
+
+        # Extraction pool, created on first run and kept for the whole session
+        # so the workers' text/OCR caches survive between runs
+        self._pool = None
 
         # Initialize state
         self.selected_files = []
         self._processing = False
+        self._work_q = None
+        self._run_warnings = []
         self._dialog_open = False
         self._last_dir = None
 
@@ -61,6 +99,39 @@ class WaterBillProcessorGUI:
 
         self.setup_gui()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Shut down the extraction pool and close the window"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.root.destroy()
+
+    @property
+    def pool(self):
+        """Extraction process pool, created on first use - workers start as jobs arrive"""
+        if self._pool is None:
+            from extractors.pool import create_pool
+            self._pool = create_pool(os.cpu_count() or 1, self._log_queue)
+        return self._pool
+
+    @property
+    def renamer(self):
+        """File renamer, imported and created on first use"""
+        if self._renamer is None:
+            from processors.file_renamer import FileRenamer
+            self._renamer = FileRenamer()
+        return self._renamer
+
+    @property
+    def excel_processor(self):
+        """Excel processor, imported and created on first use"""
+        if self._excel_processor is None:
+            from processors.excel_processor import ExcelProcessor
+            self._excel_processor = ExcelProcessor()
+        return self._excel_processor
+
     def setup_gui(self):
         """Setup the GUI components with Windows styling"""
         # Configure styling for Windows
@@ -258,27 +329,16 @@ class WaterBillProcessorGUI:
         self.clear_btn.grid(row=0, column=1, sticky=tk.E, pady=(0, 10), padx=(0, 5))
 
         # Treeview with guaranteed scrollbar - simplified approach
-        columns = (
-            "Original File", "Renamed File", "Account", "Statement Date",
-            "Bill Start", "Bill End", "Usage (gal)", "Amount", "Status",
-        )
+        columns = tuple(name for name, _, _ in RESULT_COLUMNS)
         
         # Set fixed height to ensure scrollbar appears when needed
         self.results_tree = ttk.Treeview(self.results_frame, columns=columns, show="headings", height=8)
         
-        # Configure column headings and widths
-        for col in columns:
-            self.results_tree.heading(col, text=col)
-
-        self.results_tree.column("Original File", width=180, minwidth=120)
-        self.results_tree.column("Renamed File", width=180, minwidth=120)
-        self.results_tree.column("Account", width=100, minwidth=80)
-        self.results_tree.column("Statement Date", width=110, minwidth=90)
-        self.results_tree.column("Bill Start", width=90, minwidth=70)
-        self.results_tree.column("Bill End", width=90, minwidth=70)
-        self.results_tree.column("Usage (gal)", width=100, minwidth=80)
-        self.results_tree.column("Amount", width=90, minwidth=70)
-        self.results_tree.column("Status", width=80, minwidth=60)
+        # Configure column headings and widths in a single pass
+        tree = self.results_tree
+        for name, width, minwidth in RESULT_COLUMNS:
+            tree.heading(name, text=name)
+            tree.column(name, width=width, minwidth=minwidth)
 
         # Configure treeview styling
         style.configure("Treeview", 
@@ -506,7 +566,7 @@ class WaterBillProcessorGUI:
                 break
 
     def process_files(self):
-        """Process the selected PDF files"""
+        """Start processing the selected PDF files on a background thread"""
         if not self.selected_files:
             messagebox.showwarning("No Files", "Please select PDF files first.")
             return
@@ -517,116 +577,204 @@ class WaterBillProcessorGUI:
         self._processing = True
         self.set_buttons_enabled(False)
 
-        try:
-            selected_district = self.district_var.get()
+        selected_district = self.district_var.get()
 
-            self.warnings_listbox.delete(0, tk.END)
-            warnings = []
+        self.warnings_listbox.delete(0, tk.END)
+        self._run_warnings = []
 
-            self.results_tree.delete(*self.results_tree.get_children())
-            successful_bills = []
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.status_var.set(f"Processing {len(self.selected_files)} file(s)...")
+
+        # The worker thread never touches Tk - it posts (kind, payload) messages
+        # that _drain_queue applies on the main thread, so the window stays responsive
+        self._work_q = queue.Queue()
+        threading.Thread(
+            target=self._process_worker,
+            args=(list(self.selected_files), selected_district),
+            daemon=True
+        ).start()
+        self.root.after(50, self._drain_queue)
+
+    def _process_worker(self, files, selected_district):
+        """Extract, rename and build the Excel report - runs on a background thread"""
+        post = self._work_q.put
+        try:
+            from extractors.pool import extract_one
 
-            for file_path in self.selected_files:
-                self.status_var.set(f"Processing {os.path.basename(file_path)}...")
-                self.root.update()
+            successful_bills = []
+            rename_jobs = []
 
-                logger.info(f"\n=== Processing File: {os.path.basename(file_path)} ===")
+            # The same PDF dropped twice (or under two names) would be extracted,
+            # renamed and written to the report twice - process the first copy only
+            first_copy = {}
+            unique_files = []
+            for file_path in files:
+                try:
+                    digest = _file_digest(file_path)
+                except OSError as e:
+                    logger.warning(f"Could not hash {file_path}: {e}")
+                    digest = file_path
+                if digest in first_copy:
+                    base_name = os.path.basename(file_path)
+                    logger.info(f"Skipping {base_name}: same content as {os.path.basename(first_copy[digest])}")
+                    post(("row", (
+                        base_name,
+                        "—", "—", "—", "—", "—", "—", "—",
+                        "Skipped - Duplicate"
+                    )))
+                    continue
+                first_copy[digest] = file_path
+                unique_files.append(file_path)
+            files = unique_files
+
+            # Extraction (pdfplumber + OCR) is CPU bound and independent per
+            # bill, so it runs in worker processes; results are handled here
+            total = len(files)
+            executor = self.pool
+            futures = {executor.submit(extract_one, p): i for i, p in enumerate(files)}
+
+            # Progress follows completion order, but results are kept by submit
+            # index so renames and the report are built in input order
+            results = [None] * total
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                base_name = os.path.basename(files[index])
+                post(("status", f"Processed {done}/{total}: {base_name}"))
 
                 try:
-                    import pdfplumber
-                    with pdfplumber.open(file_path) as pdf:
-                        text = pdf.pages[0].extract_text()
-                        logger.debug(f"Raw text length: {len(text) if text else 0}")
-                        if text:
-                            logger.debug(f"First 200 chars: {repr(text[:200])}")
+                    results[index] = future.result()
                 except Exception as e:
-                    logger.error(f"Debug extraction failed: {e}")
+                    logger.error(f"Extraction failed for {base_name}: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        # A dead worker breaks the whole pool - start a fresh one next run
+                        self._pool = None
 
-                bill_data = None
-                actual_district = None
+            for file_path, bill_data in zip(files, results):
+                base_name = os.path.basename(file_path)
 
-                nmwd_data = self.nmwd_extractor.extract_data(file_path)
-                if nmwd_data:
-                    if hasattr(nmwd_data, 'district') and nmwd_data.district == "North Marin":
-                        bill_data = nmwd_data
-                        actual_district = "North Marin"
+                logger.info(f"\n=== Processing File: {base_name} ===")
 
-                if not bill_data:
-                    mmwd_data = self.mmwd_extractor.extract_data(file_path)
-                    if mmwd_data:
-                        if hasattr(mmwd_data, 'district') and mmwd_data.district == "Marin Municipal":
-                            bill_data = mmwd_data
-                            actual_district = "Marin Municipal"
+                actual_district = bill_data.district if bill_data else None
 
                 if bill_data and actual_district != selected_district:
-                    warning_msg = f"{os.path.basename(file_path)}: Bill is from {actual_district}, skipping (expected {selected_district})"
-                    warnings.append(warning_msg)
-                    self.warnings_listbox.insert(tk.END, warning_msg)
-
-                    self.results_tree.insert("", "end", values=(
-                        os.path.basename(file_path),
+                    post(("warning", f"{base_name}: Bill is from {actual_district}, skipping (expected {selected_district})"))
+                    post(("row", (
+                        base_name,
                         "—",
                         bill_data.account_number if bill_data else "—",
                         bill_data.bill_date if bill_data else "—",
                         "—", "—", "—", "—",
                         "Skipped - Wrong District"
-                    ))
+                    )))
                     continue
 
                 if bill_data:
                     try:
+                        # rename_files() creates the month folder itself
                         new_filename = self.renamer.generate_filename(bill_data)
-
-                        month_folder = month_year_folder(bill_data.bill_date)
-                        district_bills_dir = BILLS_DIRS[selected_district] / month_folder
-                        district_bills_dir.mkdir(parents=True, exist_ok=True)
-
-                        new_path = self.renamer.rename_file(file_path, bill_data)
-
-                        self.results_tree.insert(
-                            "", "end",
-                            values=(
-                                bill_data.original_filename,
-                                new_filename,
-                                bill_data.account_number,
-                                bill_data.bill_date,
-                                bill_data.bill_start_date,
-                                bill_data.bill_end_date,
-                                f"{bill_data.current_usage_gallons:,}",
-                                f"${bill_data.total_due:,.2f}",
-                                "Success",
-                            ),
-                        )
-
-                        successful_bills.append(bill_data)
+                        rename_jobs.append((file_path, bill_data, new_filename))
                     except Exception as e:
                         logger.error(f"Error processing bill: {e}", exc_info=True)
-                        self.results_tree.insert("", "end", values=(
-                            os.path.basename(file_path),
+                        post(("row", (
+                            base_name,
                             "Error",
                             "—", "—", "—", "—", "—",
                             f"Rename failed: {str(e)[:30]}",
                             "Failed"
-                        ))
+                        )))
                 else:
-                    self.results_tree.insert("", "end", values=(
-                        os.path.basename(file_path),
+                    post(("row", (
+                        base_name,
                         "—", "—", "—", "—", "—", "—", "—",
                         "Unable to extract data"
-                    ))
+                    )))
+
+            # The copies are I/O bound (usually to the network share), so the
+            # renamer runs them concurrently once extraction is done
+            copied_paths = []
+            if rename_jobs:
+                post(("status", f"Copying {len(rename_jobs)} renamed bill(s)..."))
+                copied_paths = self.renamer.rename_files([(file_path, bill_data) for file_path, bill_data, _ in rename_jobs])
+
+            for (file_path, bill_data, new_filename), copied_path in zip(rename_jobs, copied_paths):
+                if copied_path is None:
+                    logger.error(f"Could not copy {file_path} as {new_filename}")
+                    post(("row", (
+                        os.path.basename(file_path),
+                        "Error",
+                        "—", "—", "—", "—", "—",
+                        "Rename failed: could not copy",
+                        "Failed"
+                    )))
+                    continue
 
+                post(("row", (
+                    bill_data.original_filename,
+                    new_filename,
+                    bill_data.account_number,
+                    bill_data.bill_date,
+                    bill_data.bill_start_date,
+                    bill_data.bill_end_date,
+                    f"{bill_data.current_usage_gallons:,}",
+                    f"${bill_data.total_due:,.2f}",
+                    "Success",
+                )))
+
+                successful_bills.append(bill_data)
+
+            excel_path = None
             if successful_bills:
                 logger.info(f"\n=== Generating Excel Report for {len(successful_bills)} bills ===")
+                post(("status", f"Generating Excel report for {len(successful_bills)} bill(s)..."))
                 excel_path = self.excel_processor.generate_excel_report(successful_bills, selected_district)
 
                 if hasattr(self.excel_processor, 'last_unmatched'):
                     for acct, filename in self.excel_processor.last_unmatched:
-                        warning_msg = f"{filename}: Account {acct} not found in Excel template"
-                        warnings.append(warning_msg)
-                        self.warnings_listbox.insert(tk.END, warning_msg)
+                        post(("warning", f"{filename}: Account {acct} not found in Excel template"))
+
+            post(("done", (selected_district, successful_bills, excel_path)))
 
+        except BaseException as e:
+            # Also catches the SystemExit raised by a missing PDF/Excel
+            # dependency on import - the Tk side must always hear back
+            logger.exception("Fatal error in process_files")
+            post(("error", e))
+
+    def _drain_queue(self):
+        """Apply messages posted by the processing thread to the GUI"""
+        try:
+            while True:
+                kind, payload = self._work_q.get_nowait()
+                if kind == "status":
+                    self.status_var.set(payload)
+                elif kind == "row":
+                    self.results_tree.insert("", "end", values=payload)
+                elif kind == "warning":
+                    self._run_warnings.append(payload)
+                    self.warnings_listbox.insert(tk.END, payload)
+                elif kind == "done":
+                    self._finish_processing(*payload)
+                    return
+                elif kind == "error":
+                    try:
+                        messagebox.showerror("Error", f"An unexpected error occurred:\n\n{str(payload)}")
+                    finally:
+                        self._processing = False
+                        self.set_buttons_enabled(True)
+                    return
+        except queue.Empty:
+            pass
+
+        self.root.after(50, self._drain_queue)
+
+    def _finish_processing(self, selected_district, successful_bills, excel_path):
+        """Report the outcome of a processing run - runs on the Tk thread"""
+        try:
+            warnings = self._run_warnings
+
+            if successful_bills:
                 if excel_path:
-                    month_folder = month_year_folder(successful_bills[0].bill_date)
+                    month_folder = month_year_folder(successful_bills[0].bill_date_dt)
                     self.status_var.set(
                         f"Processed {len(successful_bills)} files. Excel report: {os.path.basename(excel_path)}"
                     )
@@ -662,23 +810,9 @@ class WaterBillProcessorGUI:
                     else:
                         error_details += f"✓ Output directory accessible\n\n"
                     
-                    # Check log file location
-                    possible_desktops = [
-                        Path.home() / "Desktop" / "WaterBillProcessor_Logs",
-                        Path.home() / "OneDrive" / "Desktop" / "WaterBillProcessor_Logs",
-                    ]
-                    
-                    log_dir = None
-                    for loc in possible_desktops:
-                        if loc and loc.exists():
-                            log_dir = loc
-                            break
-                    
-                    if not log_dir:
-                        import tempfile
-                        log_dir = Path(tempfile.gettempdir()) / "WaterBillProcessor_Logs"
-                    
-                    error_details += f"📋 Check the log file for details:\n   {log_dir}\n\n"
+                    # Point at the folder the logs are actually written to
+                    if self._log_dir:
+                        error_details += f"📋 Check the log file for details:\n   {self._log_dir}\n\n"
                     error_details += "Common fixes:\n"
                     error_details += "• Close any open Excel files\n"
                     error_details += "• Check network drive (X:) is connected\n"
@@ -699,7 +833,7 @@ class WaterBillProcessorGUI:
                 self.results_frame.grid_configure(row=5)
 
         except Exception as e:
-            logger.exception("Fatal error in process_files")
+            logger.exception("Fatal error in _finish_processing")
             messagebox.showerror("Error", f"An unexpected error occurred:\n\n{str(e)}")
         finally:
             self._processing = False
@@ -7,45 +7,96 @@ import os
 import sys
 import tkinter as tk
 from pathlib import Path
+import time
+import atexit
 import logging
-from datetime import datetime
+import logging.handlers
+import multiprocessing
+from functools import lru_cache
+
+# Background thread that writes queued log records to the log file
+LOG_LISTENER = None
+
+# Queue LOG_LISTENER reads from - a multiprocessing queue so the extraction
+# pool's workers can log into the same file
+LOG_QUEUE = None
+
+# The DEBUG log is chatty; a large buffer turns many small writes into few big ones
+LOG_BUFFER_SIZE = 128 * 1024
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that lets the write buffer fill instead of flushing every record"""
+
+    _buffering = False
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, encoding=self.encoding,
+                    errors=self.errors, buffering=LOG_BUFFER_SIZE)
+
+    def emit(self, record):
+        # StreamHandler.emit flushes after each record - skip that for routine
+        # records, but push warnings and errors to disk straight away
+        self._buffering = record.levelno < logging.WARNING
+        try:
+            super().emit(record)
+        finally:
+            self._buffering = False
+
+    def flush(self):
+        if not self._buffering:
+            super().flush()
 
 # Setup logging to file FIRST (before any other imports)
 def setup_logging():
     """Setup logging to a file - handles OneDrive Desktop"""
     # Try multiple possible Desktop locations
-    possible_desktops = [
+    userprofile = os.environ.get('USERPROFILE')
+    possible_desktops = (
         Path.home() / "Desktop",
         Path.home() / "OneDrive" / "Desktop",
-        Path(os.environ.get('USERPROFILE', '')) / "Desktop" if os.environ.get('USERPROFILE') else None,
+        Path(userprofile) / "Desktop" if userprofile else None,
         Path.home()  # Fallback to home directory
-    ]
+    )
     
-    log_dir = None
+    # EAFP: mkdir without parents fails when the Desktop itself is missing,
+    # so one syscall replaces the exists() + mkdir() pair per candidate
     for desktop in possible_desktops:
-        if desktop and desktop.exists():
-            log_dir = desktop / "WaterBillProcessor_Logs"
-            try:
-                log_dir.mkdir(exist_ok=True)
-                break
-            except:
-                continue
-    
-    # If no Desktop found, use temp directory
-    if not log_dir or not log_dir.exists():
+        if not desktop:
+            continue
+        log_dir = desktop / "WaterBillProcessor_Logs"
+        try:
+            log_dir.mkdir(exist_ok=True)
+            break
+        except OSError:
+            continue
+    else:
+        # If no Desktop found, use temp directory
         import tempfile
         log_dir = Path(tempfile.gettempdir()) / "WaterBillProcessor_Logs"
         log_dir.mkdir(exist_ok=True)
     
-    log_file = log_dir / f"debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    log_file = log_dir / f"debug_{time.strftime('%Y%m%d_%H%M%S')}.log"
     
-    # Configure logging - FILE ONLY, don't redirect stdout
+    # Configure logging - FILE ONLY, don't redirect stdout.
+    # Callers only enqueue records; LOG_LISTENER formats and writes them on
+    # its own thread so processing never blocks on disk I/O
+    global LOG_LISTENER, LOG_QUEUE
+    file_handler = BufferedFileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    LOG_QUEUE = log_queue = multiprocessing.Queue()
+    LOG_LISTENER = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    LOG_LISTENER.start()
+    # atexit runs last-registered first: drain the queue, then flush the buffer
+    atexit.register(file_handler.flush)
+    atexit.register(LOG_LISTENER.stop)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
     logging.basicConfig(
         level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8')
-        ]
+        handlers=[queue_handler]
     )
     
     # Log startup info
@@ -56,20 +107,16 @@ def setup_logging():
     logging.info(f"Current directory: {os.getcwd()}")
     logging.info("="*60)
     
-    return log_file
+    return log_file, log_dir
 
-# Setup logging immediately
-LOG_FILE = setup_logging()
-
-try:
-    from tkinterdnd2 import TkinterDnD, DND_FILES
-    DND_OK = True
-except Exception:
-    DND_OK = False
-    TkinterDnD = tk
-    DND_FILES = None
+# PDF extraction runs in a process pool. Frozen worker processes must be
+# handed off here, before any logging or GUI setup runs.
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
 
-from gui.main_window import WaterBillProcessorGUI
+# Setup logging immediately (not in spawned workers, which import this as __mp_main__)
+# LOG_DIR is reused by show_log_location and the GUI rather than probing the Desktop again
+LOG_FILE, LOG_DIR = setup_logging() if __name__ != "__mp_main__" else (None, None)
 
 def setup_bundled_dependencies():
     """Setup paths for bundled Tesseract and Poppler"""
@@ -94,51 +141,65 @@ def setup_bundled_dependencies():
     else:
         logging.info("Running from source - using system dependencies")
 
-def check_dependencies():
-    """Check if dependencies are available (after setup)"""
-    missing = []
-
-    # Test Tesseract
+@lru_cache(maxsize=1)
+def _tesseract_error():
+    """None if Tesseract runs, else the error - cached because the probe spawns tesseract"""
     try:
         import pytesseract
         pytesseract.get_tesseract_version()
-        logging.info("Tesseract: Available")
+        return None
     except Exception as e:
-        missing.append(f"Tesseract OCR: {str(e)}")
+        return str(e)
 
-    # Test Poppler
+@lru_cache(maxsize=1)
+def _pdf_rasterizer():
+    """(backend, error) for rendering PDFs - pypdfium2 renders in-process, Poppler is the fallback"""
+    try:
+        import pypdfium2
+        return "pypdfium2", None
+    except Exception:
+        pass
     try:
         from pdf2image import convert_from_path
-        logging.info("Poppler: Available")
+        return "Poppler", None
     except Exception as e:
-        missing.append(f"Poppler: {str(e)}")
+        return None, str(e)
+
+def check_dependencies():
+    """Check if dependencies are available (after setup)"""
+    missing = []
+
+    # Test Tesseract
+    error = _tesseract_error()
+    if error is None:
+        logging.info("Tesseract: Available")
+    else:
+        missing.append(f"Tesseract OCR: {error}")
+
+    # Test the PDF rasterizer
+    backend, error = _pdf_rasterizer()
+    if backend:
+        logging.info(f"{backend}: Available")
+    else:
+        missing.append(f"Poppler: {error}")
 
     return missing
 
 def show_log_location(root):
     """Show a message box with the log file location"""
-    # Find where logs are actually saved
-    possible_desktops = [
-        Path.home() / "Desktop" / "WaterBillProcessor_Logs",
-        Path.home() / "OneDrive" / "Desktop" / "WaterBillProcessor_Logs",
-        Path(os.environ.get('USERPROFILE', '')) / "Desktop" / "WaterBillProcessor_Logs" if os.environ.get('USERPROFILE') else None,
-    ]
-    
-    log_dir = None
-    for loc in possible_desktops:
-        if loc and loc.exists():
-            log_dir = loc
-            break
-    
-    if not log_dir:
-        import tempfile
-        log_dir = Path(tempfile.gettempdir()) / "WaterBillProcessor_Logs"
-    
-    msg = f"Debug logs are being saved to:\n\n{log_dir}\n\nIf you encounter any issues, please send the latest log file to support."
+    msg = f"Debug logs are being saved to:\n\n{LOG_DIR}\n\nIf you encounter any issues, please send the latest log file to support."
     
     from tkinter import messagebox
     messagebox.showinfo("Debug Logging Enabled", msg)
 
+def _get_tk_root():
+    """Create the Tk root window - with drag-and-drop when tkinterdnd2 is installed"""
+    try:
+        from tkinterdnd2 import TkinterDnD
+    except Exception:
+        return tk.Tk()
+    return TkinterDnD.Tk()
+
 def main():
     """Run the application"""
     try:
@@ -152,8 +213,13 @@ def main():
                 logging.warning(f"  - {dep}")
             logging.warning("Some features may not work correctly.")
 
-        root = TkinterDnD.Tk() if DND_OK else tk.Tk()
-        app = WaterBillProcessorGUI(root)
+        # Imported here, not at module level, so the window module (and the
+        # tkinterdnd2 load) stays off the startup path - and out of the
+        # extraction pool's worker processes, which re-import this module
+        from gui.main_window import WaterBillProcessorGUI
+
+        root = _get_tk_root()
+        app = WaterBillProcessorGUI(root, log_queue=LOG_QUEUE, log_dir=LOG_DIR)
 
         if missing_deps and hasattr(app, 'warnings_listbox'):
             for dep in missing_deps:
@@ -1,5 +1,5 @@
 """Models package for Water Bill PDF Processor"""
 
-from .bill_data import BillData, normalize_mmddyyyy, extract_period_dates
+from .bill_data import BillData, normalize_mmddyyyy, extract_period_dates, parse_mmddyyyy
 
-__all__ = ['BillData', 'normalize_mmddyyyy', 'extract_period_dates']
\ No newline at end of file
+__all__ = ['BillData', 'normalize_mmddyyyy', 'extract_period_dates', 'parse_mmddyyyy']
\ No newline at end of file
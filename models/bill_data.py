@@ -4,8 +4,26 @@ Data models for Water Bill PDF Processor
 
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 import re
 
+# strptime is the expensive part of normalizing a date, so anything that
+# can't be a M/D/Y date is rejected by this guard first
+_MMDDYYYY_RE = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}")
+_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y")
+
+# What parse_mmddyyyy accepts: ASCII digits only, 4-digit year, no padding
+_STRICT_MMDDYYYY_RE = re.compile(r"[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}")
+
+_PERIOD_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+        r'FROM\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+TO\s+(\d{1,2}/\d{1,2}/\d{2,4})',
+        r'(?:Meter\s+Read\s+Date|Service\s+Period)[:\s]*'
+        r'(\d{1,2}/\d{1,2}/\d{2,4})\s*(?:to|[-–])\s*(\d{1,2}/\d{1,2}/\d{2,4})',
+    )
+]
+
 @dataclass
 class BillData:
     """Data structure for bill information"""
@@ -20,12 +38,41 @@ class BillData:
     original_filename: str
     bill_start_date: str = ""
     bill_end_date: str = ""
+    bill_date_dt: Optional[datetime] = None
+
+    def __post_init__(self):
+        # Parse bill_date once here; renaming, folder and Excel code all read bill_date_dt
+        if self.bill_date_dt is None:
+            self.bill_date_dt = parse_mmddyyyy(self.bill_date)
+
+        # Extractors may hand over strings - coerce once so consumers can use the values directly
+        try:
+            self.current_usage_gallons = int(self.current_usage_gallons)
+        except (TypeError, ValueError):
+            pass
+        try:
+            self.total_due = float(self.total_due)
+        except (TypeError, ValueError):
+            pass
+
+def parse_mmddyyyy(date_str: str) -> Optional[datetime]:
+    """Parse a strict MM/DD/YYYY string (much faster than strptime); None if it isn't one."""
+    # int() alone would also take whitespace, signs, underscores and non-ASCII digits
+    if not isinstance(date_str, str) or not _STRICT_MMDDYYYY_RE.fullmatch(date_str):
+        return None
+    month, day, year = date_str.split("/")
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
 
 def normalize_mmddyyyy(date_str: str) -> str:
     """Return date string as MM/DD/YYYY (pads zeros, handles 2-digit years)."""
     date_str = date_str.strip()
+    if not _MMDDYYYY_RE.fullmatch(date_str):
+        return date_str
 
-    for fmt in ("%m/%d/%Y", "%m/%d/%y", "%-m/%-d/%Y", "%-m/%-d/%y"):
+    for fmt in _DATE_FORMATS:
         try:
             dt = datetime.strptime(date_str, fmt)
             return dt.strftime("%m/%d/%Y")
@@ -50,15 +97,8 @@ def extract_period_dates(text: str) -> tuple[str, str]:
       - 'Meter Read Date: MM/DD/YYYY - MM/DD/YYYY'
       - 'Service Period: MM/DD/YYYY to MM/DD/YYYY'
     """
-    patterns = [
-        r'(\d{1,2}/\d{1,2}/\d{2,4})\s*[-–]\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-        r'FROM\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+TO\s+(\d{1,2}/\d{1,2}/\d{2,4})',
-        r'(?:Meter\s+Read\s+Date|Service\s+Period)[:\s]*'
-        r'(\d{1,2}/\d{1,2}/\d{2,4})\s*(?:to|[-–])\s*(\d{1,2}/\d{1,2}/\d{2,4})',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, flags=re.IGNORECASE)
+    for pattern in _PERIOD_PATTERNS:
+        match = pattern.search(text)
         if match:
             start, end = match.group(1), match.group(2)
             return normalize_mmddyyyy(start), normalize_mmddyyyy(end)
@@ -1,18 +1,18 @@
 """
-Excel template processing functionality - DEBUG VERSION
-Replace the content of processors/excel_processor.py with this temporarily
+Excel template processing functionality
 """
 
 import os
 import re
 import logging
+from io import BytesIO
 from typing import List, Optional
-from datetime import datetime
 from pathlib import Path
 
 try:
     from openpyxl import load_workbook
     from openpyxl.styles import numbers
+    from openpyxl.xml import LXML
 except ImportError as e:
     raise SystemExit(f"Missing Excel dependency: {e}")
 
@@ -21,41 +21,130 @@ from config import TEMPLATES, DISTRICT_CONFIG, EXCEL_LAYOUT, REPORTS_DIRS
 
 logger = logging.getLogger(__name__)
 
+# openpyxl serializes through lxml when it is installed - roughly twice as fast to save
+if not LXML:
+    logger.warning("lxml not installed - Excel reports will save more slowly")
+
+# Number formats applied to populated cells, by column (A's date format is
+# only applied when the bill date parsed)
+ROW_NUMBER_FORMATS = {
+    9: numbers.FORMAT_CURRENCY_USD_SIMPLE,  # I - charges
+    10: '#,##0',                            # J - usage (gal)
+}
+
+# Report filename per district - both districts save to the same Pending Invoice folder
+REPORT_FILENAMES = {
+    "North Marin": "BioMarin Pharmaceutical Inc. Account Allocation - North Marin Water.xlsx",
+    "Marin Municipal": "BioMarin Pharmaceutical Inc. Account Allocation - Marin Municipal Water District.xlsx",
+}
+
+# Commodity, GL code, vendor ID and supplier (D-G) are pre-filled on the
+# template's rows, so they are only written where blank.
+CONSTANT_COLS = (4, 5, 6, 7)
+CHARGES_COL = 9
+
+# Deletes every non-digit ASCII character in one C-level str.translate pass
+_NON_DIGITS_TABLE = {code: None for code in range(128) if not chr(code).isdigit()}
+_NON_DIGIT_RE = re.compile(r"\D")
+
+def _digits_only(value) -> str:
+    """Keep only the digits of an account value"""
+    digits = str(value).translate(_NON_DIGITS_TABLE)
+    if not digits.isascii():
+        # Rare (OCR noise): apply the full Unicode-aware rule
+        digits = _NON_DIGIT_RE.sub("", digits)
+    return digits
+
 class ExcelProcessor:
     """Process Excel templates and populate with bill data"""
 
+    def __init__(self):
+        # Template files are read once; every report re-opens its workbook from memory
+        self._template_bytes = {}
+        for district, template_path in TEMPLATES.items():
+            try:
+                self._template_bytes[district] = Path(template_path).read_bytes()
+            except OSError as e:
+                logger.warning(f"Could not preload template for {district}: {e}")
+
+        # Report directories already created/verified this session
+        self._ready_dirs = set()
+
+        # Columns D-G are the same on every row of a district's report
+        self._const_cols = {
+            district: ("Water", "105-000-60035-803-0000", cfg["vendor_id"], cfg["supplier_name"])
+            for district, cfg in DISTRICT_CONFIG.items()
+        }
+
+    def _load_template(self, district: str):
+        """Open a fresh workbook for the district's template from the in-memory copy"""
+        if district not in self._template_bytes:
+            self._template_bytes[district] = Path(TEMPLATES[district]).read_bytes()
+        # Formulas are kept (data_only=False); the templates carry no VBA or
+        # external links, so openpyxl is told not to parse or keep them
+        return load_workbook(
+            BytesIO(self._template_bytes[district]),
+            data_only=False, keep_vba=False, keep_links=False, rich_text=False
+        )
+
     @staticmethod
     def _norm_acct(value) -> str:
         """Normalize account strings/numbers to digits-only for comparison."""
         if value is None:
             return ""
-        return re.sub(r"\D", "", str(value))
+        return _digits_only(value)
 
     @staticmethod
-    def _is_account_match(bill_account: str, excel_account: str) -> bool:
-        """Check if bill account matches excel account (handles partial matches)"""
-        if not bill_account or not excel_account:
-            return False
-
-        bill_norm = re.sub(r"\D", "", str(bill_account))
-        excel_norm = re.sub(r"\D", "", str(excel_account))
-
-        if bill_norm == excel_norm:
-            return True
-
-        if bill_norm in excel_norm:
-            return True
+    def _substrings(value: str) -> set:
+        """Every substring of value, including the empty string"""
+        return {value[i:j] for i in range(len(value) + 1) for j in range(i, len(value) + 1)}
+
+    def _build_account_index(self, excel_accounts: dict) -> tuple:
+        """
+        Index template accounts so each bill's matching rows are found by
+        hash lookups instead of comparing against every row. Accounts are
+        compared as digits only; they match when equal or when either one
+        contains the other.
+        Returns (rows by normalized account, rows by substring of normalized account).
+        """
+        by_account = {}
+        by_substring = {}
+        for row_num, excel_account in excel_accounts.items():
+            excel_norm = self._norm_acct(excel_account)
+            by_account.setdefault(excel_norm, set()).add(row_num)
+            for part in self._substrings(excel_norm):
+                by_substring.setdefault(part, set()).add(row_num)
+        return by_account, by_substring
+
+    def _matching_rows(self, bill_account: str, account_index: tuple) -> list:
+        """
+        Rows whose account matches bill_account, in row order. Both sides are
+        reduced to digits; a row matches when the two are equal or either one
+        is a substring of the other. An account with no digits reduces to the
+        empty string, which is a substring of everything - so such a bill
+        matches every row, and such a template row matches every bill.
+        """
+        if not bill_account:
+            return []
+        by_account, by_substring = account_index
+        bill_norm = self._norm_acct(bill_account)
+
+        # Excel account contains the bill account (covers equality)...
+        rows = set(by_substring.get(bill_norm, ()))
+        # ...or the bill account contains the Excel account
+        for part in self._substrings(bill_norm):
+            rows.update(by_account.get(part, ()))
+        return sorted(rows)
 
-        if excel_norm in bill_norm:
-            return True
-
-        return False
+    @staticmethod
+    def _is_blank_value(cell_value) -> bool:
+        """Check if a cell value is empty or only whitespace"""
+        return cell_value is None or (type(cell_value) is str and not cell_value.strip())
 
     @staticmethod
     def _is_blank(cell) -> bool:
         """Check if a cell is blank or contains only whitespace"""
-        cell_value = cell.value
-        return cell_value is None or (isinstance(cell_value, str) and cell_value.strip() == "")
+        return ExcelProcessor._is_blank_value(cell.value)
 
     def generate_excel_report(self, bills: List[BillData], district: str) -> Optional[str]:
         """Fill existing template rows by matching Account Number (col H). Do NOT add/delete rows."""
@@ -71,44 +160,60 @@ class ExcelProcessor:
             logger.info(f"EXCEL GENERATION DEBUG - {district}")
             logger.info("="*60)
             logger.info(f"Template path: {template_path}")
-            logger.info(f"Current directory: {os.getcwd()}")
-            logger.info(f"Template exists: {os.path.exists(template_path)}")
-            
-            # List Excel files in current directory
-            excel_files = [f for f in os.listdir('.') if f.endswith('.xlsx')]
-            logger.info(f"Excel files in current directory: {len(excel_files)}")
-            for f in excel_files:
-                logger.info(f"   - {f}")
-            
-            if not os.path.exists(template_path):
-                logger.error(f"ERROR: Template not found at {template_path}")
-                return None
+
+            # Directory listing is diagnostics only - skip the scan unless DEBUG is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Current directory: %s", os.getcwd())
+                excel_files = [f for f in os.listdir('.') if f.endswith('.xlsx')]
+                logger.debug("Excel files in current directory: %d", len(excel_files))
+                for f in excel_files:
+                    logger.debug("   - %s", f)
 
             logger.info(f"Loading workbook...")
-            workbook = load_workbook(template_path)
+            try:
+                workbook = self._load_template(district)
+            except FileNotFoundError:
+                logger.error(f"ERROR: Template not found at {template_path}")
+                return None
             worksheet = workbook.active
             logger.info(f"Workbook loaded - Sheet: '{worksheet.title}'")
             
-            config = DISTRICT_CONFIG[district]
+            const_cols = self._const_cols[district]
             start_row = EXCEL_LAYOUT["start_row"]
             account_col = EXCEL_LAYOUT["account_col"]
             logger.info(f"Start row: {start_row}, Account column: {account_col}")
 
             excel_accounts = {}
-
-            # Read accounts from template
-            logger.info(f"\nScanning for accounts in template...")
-            for row_num in range(start_row, min(start_row + 50, worksheet.max_row + 1)):
-                cell_value = worksheet.cell(row=row_num, column=account_col).value
+            # Account rows whose charges column (I) is still empty, kept up to
+            # date as rows are populated, and rows that already have D-G
+            blank_charges = set()
+            constants_filled = set()
+
+            # Read accounts from template - one values_only pass over D..I
+            # collects accounts, charges and constants without any Cell objects
+            logger.debug("Scanning for accounts in template...")
+            first_col = min(CONSTANT_COLS[0], account_col)
+            row_values = worksheet.iter_rows(
+                min_row=start_row, max_row=min(start_row + 49, worksheet.max_row),
+                min_col=first_col, max_col=max(CHARGES_COL, account_col), values_only=True
+            )
+            for row_num, values in enumerate(row_values, start=start_row):
+                cell_value = values[account_col - first_col]
                 if cell_value:
                     excel_account = str(cell_value).strip()
                     excel_accounts[row_num] = excel_account
+                    if self._is_blank_value(values[CHARGES_COL - first_col]):
+                        blank_charges.add(row_num)
+                    constants = values[CONSTANT_COLS[0] - first_col:CONSTANT_COLS[-1] - first_col + 1]
+                    if not any(self._is_blank_value(v) for v in constants):
+                        constants_filled.add(row_num)
 
             logger.info(f"Found {len(excel_accounts)} accounts in template")
             if excel_accounts:
-                logger.info(f"Sample accounts (first 5):")
-                for row, acct in list(excel_accounts.items())[:5]:
-                    logger.info(f"   Row {row}: {acct}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sample accounts (first 5):")
+                    for row, acct in list(excel_accounts.items())[:5]:
+                        logger.debug("   Row %s: %s", row, acct)
             else:
                 logger.warning(f"WARNING: No accounts found!")
                 logger.info(f"Checking cells around expected location:")
@@ -123,32 +228,30 @@ class ExcelProcessor:
             logger.info(f"\nProcessing {len(bills)} bills...")
             matched_count = 0
             
+            account_index = self._build_account_index(excel_accounts)
+
             for i, bill in enumerate(bills, 1):
-                logger.info(f"\n  Bill {i}/{len(bills)}: Account {bill.account_number}")
-                target_row = None
-
-                # Try to find blank matching row first
-                for row_num, excel_account in excel_accounts.items():
-                    if self._is_account_match(bill.account_number, excel_account):
-                        if self._is_blank(worksheet.cell(row=row_num, column=9)):
-                            target_row = row_num
-                            logger.info(f"    Found BLANK row {row_num} (Excel account: {excel_account})")
-                            break
-
-                # If no blank row, use any matching row
-                if target_row is None:
-                    for row_num, excel_account in excel_accounts.items():
-                        if self._is_account_match(bill.account_number, excel_account):
-                            target_row = row_num
-                            logger.info(f"    Found OCCUPIED row {row_num} (Excel account: {excel_account})")
-                            break
+                logger.debug("Bill %d/%d: Account %s", i, len(bills), bill.account_number)
+                matching_rows = self._matching_rows(bill.account_number, account_index)
+
+                # One pass: the first matching row with blank charges, else the
+                # first matching row at all
+                target_row = next((row_num for row_num in matching_rows if row_num in blank_charges), None)
+                if target_row is not None:
+                    logger.debug("    Found BLANK row %d (Excel account: %s)", target_row, excel_accounts[target_row])
+                elif matching_rows:
+                    target_row = matching_rows[0]
+                    logger.debug("    Found OCCUPIED row %d (Excel account: %s)", target_row, excel_accounts[target_row])
 
                 if target_row:
-                    logger.info(f"    Populating row {target_row}")
-                    self._populate_row(worksheet, target_row, bill, config)
+                    logger.debug("    Populating row %d", target_row)
+                    self._populate_row(worksheet, target_row, bill, const_cols, target_row in constants_filled)
+                    # A blank charges cell was just given total_due (it stays blank only if that is blank)
+                    if not self._is_blank_value(bill.total_due):
+                        blank_charges.discard(target_row)
                     matched_count += 1
                 else:
-                    logger.warning(f"    NO MATCH FOUND for account {bill.account_number}")
+                    logger.warning("NO MATCH FOUND for account %s", bill.account_number)
                     self.last_unmatched.append((bill.account_number, bill.original_filename))
 
             logger.info(f"\nSummary: {matched_count}/{len(bills)} bills matched")
@@ -161,30 +264,19 @@ class ExcelProcessor:
             output_path = self._generate_output_path(district, bills)
             logger.info(f"\nOutput path: {output_path}")
             logger.info(f"Output directory: {output_path.parent}")
-            logger.info(f"Directory exists: {output_path.parent.exists()}")
-            
+
             # Create directory if needed
             try:
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if output_path.parent not in self._ready_dirs:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._ready_dirs.add(output_path.parent)
                 logger.info(f"Directory ready")
             except Exception as e:
                 logger.error(f"ERROR creating directory: {e}")
                 return None
 
-            # Check if file is already open
-            if output_path.exists():
-                logger.info(f"File already exists, will overwrite")
-                try:
-                    # Test if we can write to it
-                    with open(output_path, 'a'):
-                        pass
-                    logger.info(f"File is not locked")
-                except PermissionError:
-                    logger.error(f"ERROR: File is open in Excel or locked!")
-                    logger.error(f"   Please close the file and try again.")
-                    return None
-
-            # Save the workbook
+            # Save the workbook - an existing report is overwritten; if it is open
+            # in Excel the save itself raises PermissionError (no separate lock probe)
             logger.info(f"Saving workbook...")
             try:
                 workbook.save(output_path)
@@ -193,7 +285,7 @@ class ExcelProcessor:
                 return str(output_path)
             except PermissionError as e:
                 logger.error(f"ERROR: Permission denied - {e}")
-                logger.error(f"   File may be open in Excel!")
+                logger.error(f"   File may be open in Excel! Please close the file and try again.")
                 return None
             except Exception as e:
                 logger.error(f"ERROR saving workbook: {e}")
@@ -208,59 +300,41 @@ class ExcelProcessor:
             logger.info("="*60)
             return None
 
-    def _populate_row(self, worksheet, row_num: int, bill: BillData, config: dict):
-        """Populate a single row with bill data"""
-
-        date_cell = worksheet.cell(row=row_num, column=1)
-        if self._is_blank(date_cell):
-            try:
-                invoice_date = datetime.strptime(bill.bill_date, "%m/%d/%Y")
-                date_cell.value = invoice_date
-                date_cell.number_format = numbers.FORMAT_DATE_YYYYMMDD2
-            except Exception:
-                date_cell.value = bill.bill_date
-
-        address_cell = worksheet.cell(row=row_num, column=2)
-        if self._is_blank(address_cell):
-            address_cell.value = bill.service_address
-
-        period_cell = worksheet.cell(row=row_num, column=3)
-        if self._is_blank(period_cell):
-            period_cell.value = bill.service_period
-
-        commodity_cell = worksheet.cell(row=row_num, column=4)
-        if self._is_blank(commodity_cell):
-            commodity_cell.value = "Water"
-
-        gl_cell = worksheet.cell(row=row_num, column=5)
-        if self._is_blank(gl_cell):
-            gl_cell.value = "105-000-60035-803-0000"
-
-        vendor_cell = worksheet.cell(row=row_num, column=6)
-        if self._is_blank(vendor_cell):
-            vendor_cell.value = config["vendor_id"]
-
-        supplier_cell = worksheet.cell(row=row_num, column=7)
-        if self._is_blank(supplier_cell):
-            supplier_cell.value = config["supplier_name"]
-
-        account_cell = worksheet.cell(row=row_num, column=8)
-        if self._is_blank(account_cell):
-            account_cell.value = bill.account_number
-
-        charges_cell = worksheet.cell(row=row_num, column=9)
-        if self._is_blank(charges_cell):
-            charges_cell.value = bill.total_due
-            charges_cell.number_format = numbers.FORMAT_CURRENCY_USD_SIMPLE
-
-        usage_cell = worksheet.cell(row=row_num, column=10)
-        if self._is_blank(usage_cell):
-            try:
-                gallons = int(bill.current_usage_gallons)
-            except Exception:
-                gallons = bill.current_usage_gallons
-            usage_cell.value = gallons
-            usage_cell.number_format = '#,##0'
+    def _populate_row(self, worksheet, row_num: int, bill: BillData, const_cols: tuple,
+                      constants_filled: bool = False):
+        """Populate a single row with bill data - only cells that are still blank are written"""
+        invoice_date = bill.bill_date_dt
+
+        # Bill columns A-C and H-J
+        bill_values = (
+            (1, invoice_date if invoice_date else bill.bill_date),
+            (2, bill.service_address),
+            (3, bill.service_period),
+            (8, bill.account_number),
+            (CHARGES_COL, bill.total_due),
+            (10, bill.current_usage_gallons),
+        )
+
+        # Resolve the row's cells A..J once and index them by column
+        row_cells = next(worksheet.iter_rows(min_row=row_num, max_row=row_num, max_col=EXCEL_LAYOUT["last_col"]))
+
+        for col, value in bill_values:
+            cell = row_cells[col - 1]
+            if not self._is_blank(cell):
+                continue
+            cell.value = value
+            if col == 1:
+                if invoice_date:
+                    cell.number_format = numbers.FORMAT_DATE_YYYYMMDD2
+            elif col in ROW_NUMBER_FORMATS:
+                cell.number_format = ROW_NUMBER_FORMATS[col]
+
+        # Constant columns D-G - rows the scan saw fully pre-filled are skipped
+        if not constants_filled:
+            for col, value in zip(CONSTANT_COLS, const_cols):
+                cell = row_cells[col - 1]
+                if self._is_blank(cell):
+                    cell.value = value
 
     def _generate_output_path(self, district: str, bills: List[BillData]) -> Path:
         """Generate output path for the Excel report - both districts save to same Pending Invoice folder"""
@@ -269,18 +343,15 @@ class ExcelProcessor:
         logger.info(f"Reports directory: {reports_dir}")
         
         try:
-            reports_dir.mkdir(parents=True, exist_ok=True)
+            if reports_dir not in self._ready_dirs:
+                reports_dir.mkdir(parents=True, exist_ok=True)
+                self._ready_dirs.add(reports_dir)
             logger.info(f"✓ Reports directory exists/created")
         except Exception as e:
             logger.error(f"❌ Cannot create reports directory: {e}")
 
         # Different filenames for each district
-        if district == "North Marin":
-            output_filename = "BioMarin Pharmaceutical Inc. Account Allocation - North Marin Water.xlsx"
-        else:  # Marin Municipal
-            output_filename = "BioMarin Pharmaceutical Inc. Account Allocation - Marin Municipal Water District.xlsx"
-        
-        output_path = reports_dir / output_filename
+        output_path = reports_dir / REPORT_FILENAMES.get(district, REPORT_FILENAMES["Marin Municipal"])
         
         logger.info(f"Full output path: {output_path}")
         return output_path
\ No newline at end of file
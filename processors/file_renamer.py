@@ -2,40 +2,75 @@
 File renaming functionality for water bill PDFs
 """
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from typing import List, Optional, Tuple
 from models.bill_data import BillData
 from config import BILLS_DIRS, month_year_folder
 
+# Characters allowed in generated filenames besides letters and digits
+_FILENAME_EXTRA_CHARS = " #.-_"
+
+# Deletes every disallowed ASCII character in one C-level str.translate pass
+_SANITIZE_TABLE = {
+    code: None for code in range(128)
+    if not (chr(code).isalnum() or chr(code) in _FILENAME_EXTRA_CHARS)
+}
+
+# Renamed-bill filename per district: {d} is the YYMMDD bill date, {a} the account
+_FILENAME_FORMATS = {
+    "North Marin": "{d} Account #{a}.pdf",
+    "Marin Municipal": "{d} MMWD {a}.pdf",
+}
+_DEFAULT_FILENAME_FORMAT = "{d} {a}.pdf"
+
+@lru_cache(maxsize=64)
+def _resolve_dir(district: str, bill_date) -> Path:
+    """Bills folder for a district and parsed bill date - bills in a batch mostly share one"""
+    return BILLS_DIRS[district] / month_year_folder(bill_date)
+
 class FileRenamer:
     """Handle PDF file renaming according to specifications"""
 
+    def __init__(self, preserve_metadata: bool = False):
+        # Nothing downstream reads the copied PDF's timestamps, so a plain data
+        # copy (sendfile/fcopyfile fast path) is used unless metadata is requested
+        self.preserve_metadata = preserve_metadata
+
+        # Output directories already created/verified this session - each mkdir
+        # is a round-trip to the network share, and most bills share a month
+        self._ready_dirs = set()
+
+    def ensure_directory(self, output_dir: Path):
+        """Create output_dir (and parents) once per session; raises OSError on failure"""
+        if output_dir not in self._ready_dirs:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            print(f"Created/verified directory: {output_dir}")
+            self._ready_dirs.add(output_dir)
+
     def generate_filename(self, bill_data: BillData) -> str:
         """Generate new filename based on district and data"""
-        try:
-            date_obj = datetime.strptime(bill_data.bill_date, "%m/%d/%Y")
-            date_str = date_obj.strftime("%y%m%d")
-        except:
+        if bill_data.bill_date_dt:
+            date_str = bill_data.bill_date_dt.strftime("%y%m%d")
+        else:
             date_str = "000000"
 
-        if bill_data.district == "North Marin":
-            filename = f"{date_str} Account #{bill_data.account_number}.pdf"
-        elif bill_data.district == "Marin Municipal":
-            filename = f"{date_str} MMWD {bill_data.account_number}.pdf"
-        else:
-            filename = f"{date_str} {bill_data.account_number}.pdf"
+        filename_format = _FILENAME_FORMATS.get(bill_data.district, _DEFAULT_FILENAME_FORMAT)
+        filename = filename_format.format(d=date_str, a=bill_data.account_number)
 
-        filename = "".join(c for c in filename if c.isalnum() or c in " #.-_")
+        filename = filename.translate(_SANITIZE_TABLE)
+        if not filename.isascii():
+            # Rare (OCR noise): apply the full Unicode-aware rule
+            filename = "".join(c for c in filename if c.isalnum() or c in _FILENAME_EXTRA_CHARS)
         return filename
 
     def get_output_directory(self, bill_data: BillData) -> Path:
         """Get the correct output directory based on district and bill date"""
-        base_dir = BILLS_DIRS[bill_data.district]
-
-        month_year = month_year_folder(bill_data.bill_date)
-        output_dir = base_dir / month_year
-
-        return output_dir
+        if bill_data.bill_date_dt is None:
+            # Unparsed dates fall back to the current month - not cacheable
+            return BILLS_DIRS[bill_data.district] / month_year_folder(None)
+        return _resolve_dir(bill_data.district, bill_data.bill_date_dt)
 
     def rename_file(self, original_path: str, bill_data: BillData) -> str:
         """Rename and move file to correct network location"""
@@ -44,27 +79,64 @@ class FileRenamer:
             output_dir = self.get_output_directory(bill_data)
 
             try:
-                output_dir.mkdir(parents=True, exist_ok=True)
-                print(f"Created/verified directory: {output_dir}")
+                self.ensure_directory(output_dir)
             except Exception as e:
                 print(f"Error creating directory {output_dir}: {e}")
                 return None
 
-            output_path = output_dir / new_filename
+            return self._copy(original_path, output_dir / new_filename)
+
+        except Exception as e:
+            print(f"Error in rename_file: {e}")
+            return None
 
+    def rename_files(self, jobs: List[Tuple[str, BillData]]) -> List[Optional[str]]:
+        """
+        Rename and copy several bills at once. Returns the new path (or None on
+        failure) for each (original_path, bill_data) job, in job order.
+        """
+        targets = []
+        failed_dirs = set()
+        for original_path, bill_data in jobs:
             try:
-                shutil.copy2(original_path, output_path)
-                print(f"File copied to: {output_path}")
-                return str(output_path)
-            except PermissionError as e:
-                print(f"Permission error copying file: {e}")
-                return None
+                output_dir = self.get_output_directory(bill_data)
+                if output_dir not in failed_dirs:
+                    try:
+                        self.ensure_directory(output_dir)
+                    except Exception as e:
+                        print(f"Error creating directory {output_dir}: {e}")
+                        failed_dirs.add(output_dir)
+                if output_dir in failed_dirs:
+                    targets.append(None)
+                else:
+                    targets.append((original_path, output_dir / self.generate_filename(bill_data)))
             except Exception as e:
-                print(f"Error copying file: {e}")
-                return None
+                print(f"Error in rename_files: {e}")
+                targets.append(None)
+
+        copies = [target for target in targets if target]
+        if not copies:
+            return [None] * len(jobs)
 
+        # Copies to the network share are I/O bound and release the GIL
+        with ThreadPoolExecutor(max_workers=min(16, len(copies))) as executor:
+            copied = iter(list(executor.map(self._copy, *zip(*copies))))
+        return [next(copied) if target else None for target in targets]
+
+    def _copy(self, original_path: str, output_path: Path) -> Optional[str]:
+        """Copy one bill to its new name"""
+        try:
+            if self.preserve_metadata:
+                shutil.copy2(original_path, output_path)
+            else:
+                shutil.copyfile(original_path, output_path)
+            print(f"File copied to: {output_path}")
+            return str(output_path)
+        except PermissionError as e:
+            print(f"Permission error copying file: {e}")
+            return None
         except Exception as e:
-            print(f"Error in rename_file: {e}")
+            print(f"Error copying file: {e}")
             return None
 
     def check_network_access(self, district: str) -> bool: